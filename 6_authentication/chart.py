@@ -1,8 +1,6 @@
 import pandas as pd
 import plotly.graph_objects as go
 
-data = pd.read_csv("data.csv")
-
 state_codes = {
     "Alabama": "AL",
     "Alaska": "AK",
@@ -75,18 +73,19 @@ def generate_map(data: pd.DataFrame) -> go.Figure:
         )
     )
 
-    for i, row in map_data.iterrows():
-        fig.add_trace(
-            go.Scattergeo(
-                locationmode="USA-states",
-                locations=[row["codes"]],
-                text=f"{row['codes']}",
-                hovertext=f"{row['State']}<br>${row['Sales']:,.2f}",
-                hoverinfo="text",
-                mode="text",
-                textfont=dict(size=7),
-            )
+    fig.add_trace(
+        go.Scattergeo(
+            locationmode="USA-states",
+            locations=map_data["codes"],
+            text=map_data["codes"],
+            hovertext=map_data["State"]
+            + "<br>$"
+            + map_data["Sales"].map("{:,.2f}".format),
+            hoverinfo="text",
+            mode="text",
+            textfont=dict(size=7),
         )
+    )
 
     fig.update_layout(
         title_text="Sales by State",
@@ -98,5 +97,6 @@ def generate_map(data: pd.DataFrame) -> go.Figure:
 
 
 if __name__ == "__main__":
+    data = pd.read_csv("data.csv")
     fig = generate_map(data)
     fig.show()
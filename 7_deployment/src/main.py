@@ -3,8 +3,16 @@ import taipy.gui.builder as tgb
 import pandas as pd
 
 from chart import generate_map
+from profiler import SamplingProfiler
+from sales_data import (
+    build_sales_index,
+    list_subcategories,
+    load_sales_data,
+    query_sales,
+)
 
 import os
+import sys
 from taipy.gui import notify
 import taipy.gui.builder as tgb
 from taipy.auth import hash_taipy_password, AnyOf, Credentials, Authenticator
@@ -48,7 +56,9 @@ def go_to_login(state):
     navigate(state, "login", force=True)
 
 
-data = pd.read_csv("data.csv")
+data = load_sales_data()
+sales_index = build_sales_index(data)
+subcategories_by_category = list_subcategories(data)
 chart_data = (
     data.groupby("State")["Sales"]
     .sum()
@@ -68,9 +78,7 @@ categories = list(data["Category"].unique())
 selected_category = "Furniture"
 
 selected_subcategory = "Bookcases"
-subcategories = list(
-    data[data["Category"] == selected_category]["Sub-Category"].unique()
-)
+subcategories = subcategories_by_category[selected_category]
 
 layout = {"yaxis": {"title": "Revenue (USD)"}, "title": "Sales by State"}
 
@@ -78,25 +86,19 @@ map_fig = generate_map(data)
 
 
 def change_category(state):
-    state.subcategories = list(
-        data[data["Category"] == state.selected_category]["Sub-Category"].unique()
-    )
+    state.subcategories = subcategories_by_category[state.selected_category]
     state.selected_subcategory = state.subcategories[0]
 
 
 def apply_changes(state):
-    state.data = data[
-        (
-            pd.to_datetime(data["Order Date"], format="%d/%m/%Y")
-            >= pd.to_datetime(state.start_date)
-        )
-        & (
-            pd.to_datetime(data["Order Date"], format="%d/%m/%Y")
-            <= pd.to_datetime(state.end_date)
-        )
-    ]
-    state.data = state.data[state.data["Category"] == state.selected_category]
-    state.data = state.data[state.data["Sub-Category"] == state.selected_subcategory]
+    state.data = query_sales(
+        data,
+        sales_index,
+        state.selected_category,
+        state.selected_subcategory,
+        state.start_date,
+        state.end_date,
+    )
     state.chart_data = (
         state.data.groupby("State")["Sales"]
         .sum()
@@ -189,4 +191,7 @@ pages = {
 }
 
 
+if "--profile" in sys.argv:
+    # Writes the sampled stacks of each callback to profiles/<callback>.folded
+    SamplingProfiler().start()
 Gui(pages=pages).run(title="Sales", dark_mode=False, debug=True)
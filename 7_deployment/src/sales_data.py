@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Bump when the layout of the cached table changes
+SIDECAR_VERSION = 3
+
+
+def load_sales_data(path: str = "data.csv") -> pd.DataFrame:
+    """Reads the sales CSV through an Arrow IPC sidecar (`<path>.arrow`).
+
+    The CSV stays the source of truth: the sidecar records its size and
+    modification time and is rewritten when they change. Otherwise it is
+    memory-mapped instead of parsing the text again.
+
+    The rows keep the order and the date format of the file, as the tables
+    show them.
+    """
+    stat = os.stat(path)
+    source = f"{stat.st_size}:{stat.st_mtime_ns}:{SIDECAR_VERSION}".encode()
+    sidecar = f"{path}.arrow"
+    try:
+        table = pa.ipc.open_file(pa.memory_map(sidecar)).read_all()
+        if (table.schema.metadata or {}).get(b"source") == source:
+            return table.to_pandas()
+    except (OSError, pa.ArrowInvalid):
+        pass
+
+    data = pd.read_csv(path)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"source": source})
+    try:
+        with pa.OSFile(f"{sidecar}.tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(f"{sidecar}.tmp", sidecar)
+    except OSError as e:
+        print(f"Couldn't write {sidecar}: {e}")
+    return table.to_pandas()
+
+
+def build_sales_index(data: pd.DataFrame) -> dict:
+    """Indexes the rows by (Category, Sub-Category).
+
+    Order Date is parsed once, here. Each key maps to the positions of its
+    rows and to their order dates, both sorted by date, while `data` keeps
+    the order of the file.
+    """
+    dates = pd.to_datetime(data["Order Date"], format="%d/%m/%Y").to_numpy()
+    index = {}
+    for key, positions in data.groupby(
+        ["Category", "Sub-Category"], sort=False
+    ).indices.items():
+        positions = positions[np.argsort(dates[positions], kind="stable")]
+        index[key] = (positions, dates[positions])
+    return index
+
+
+def list_subcategories(data: pd.DataFrame) -> dict:
+    """Returns the sub-categories of each category, in order of first appearance.
+
+    The first one of a category is the default the apps select.
+    """
+    subcategories = {}
+    pairs = data[["Category", "Sub-Category"]].drop_duplicates()
+    for category, subcategory in pairs.itertuples(index=False):
+        subcategories.setdefault(category, []).append(subcategory)
+    return subcategories
+
+
+def query_sales(
+    data: pd.DataFrame, index: dict, category, subcategory, start_date, end_date
+) -> pd.DataFrame:
+    """Returns the rows of a sub-category ordered between two dates (inclusive).
+
+    Only the rows of the (category, subcategory) key are visited, and the date
+    range within them is found with a binary search. The rows are returned in
+    the order of the file.
+    """
+    positions, dates = index.get((category, subcategory), (np.empty(0, int), None))
+    if dates is None:
+        return data.iloc[positions]
+    first = dates.searchsorted(pd.to_datetime(start_date).to_datetime64(), "left")
+    last = dates.searchsorted(pd.to_datetime(end_date).to_datetime64(), "right")
+    return data.iloc[np.sort(positions[first:last])]
@@ -1,5 +1,9 @@
+import argparse
+
+import numpy as np
 import pandas as pd
-import random
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # Définir manuellement toutes les régions métropolitaines françaises avec leurs départements et villes principales
 regions_departements_villes = {
@@ -139,29 +143,97 @@ secteurs_metiers = {
 
 annees = list(range(2025, 2036))
 
-# Générer des données RH synthétiques
-donnees = []
-for region, liste_dept_villes in regions_departements_villes.items():
-    for departement, ville in liste_dept_villes:
-        for secteur, metiers in secteurs_metiers.items():
-            for metier in metiers:
-                for annee in annees:
-                    donnees.append(
-                        {
-                            "Région": region,
-                            "Département": departement,
-                            "Ville": ville,
-                            "Secteur": secteur,
-                            "Métier": metier,
-                            "Recrutement": random.randint(50, 500),
-                            "Année": annee,
-                        }
-                    )
 
-# Sauvegarder en CSV
-df_rh = pd.DataFrame(donnees)
-chemin_csv = "data/hr_data.csv"
-df_rh.to_csv(chemin_csv, index=False)
-print(
-    f"✅ Jeu de données RH complet avec toutes les régions et départements français enregistré dans : {chemin_csv}"
-)
+def produit_cartesien(echelle, annees_sup, metiers_sup):
+    """Construit les listes de lieux, de métiers et d'années à croiser.
+
+    `echelle` ajoute des villes synthétiques à chaque département, `annees_sup`
+    prolonge la période et `metiers_sup` ajoute des métiers à chaque secteur.
+    """
+    lieux = [
+        (region, departement, ville if i == 0 else f"{ville} {i + 1}")
+        for region, liste_dept_villes in regions_departements_villes.items()
+        for departement, ville in liste_dept_villes
+        for i in range(echelle)
+    ]
+    postes = [
+        (secteur, metier if i == 0 else f"{metier} {i + 1}")
+        for secteur, metiers in secteurs_metiers.items()
+        for i in range(metiers_sup + 1)
+        for metier in metiers
+    ]
+    periode = np.arange(annees[0], annees[-1] + 1 + annees_sup)
+    return lieux, postes, periode
+
+
+def generer_blocs(lieux, postes, periode, rng, taille_bloc):
+    """Génère le produit lieux x postes x années par blocs de DataFrames."""
+    colonnes_lieux = [pd.Categorical(valeurs) for valeurs in zip(*lieux)]
+    colonnes_postes = [pd.Categorical(valeurs) for valeurs in zip(*postes)]
+    lignes_par_lieu = len(postes) * len(periode)
+    lieux_par_bloc = max(1, taille_bloc // lignes_par_lieu)
+    for debut in range(0, len(lieux), lieux_par_bloc):
+        nb_lieux = min(lieux_par_bloc, len(lieux) - debut)
+        n = nb_lieux * lignes_par_lieu
+        i_lieu = np.repeat(np.arange(debut, debut + nb_lieux), lignes_par_lieu)
+        i_poste = np.tile(np.repeat(np.arange(len(postes)), len(periode)), nb_lieux)
+        region, departement, ville = (
+            pd.Categorical.from_codes(c.codes[i_lieu], c.categories)
+            for c in colonnes_lieux
+        )
+        secteur, metier = (
+            pd.Categorical.from_codes(c.codes[i_poste], c.categories)
+            for c in colonnes_postes
+        )
+        yield pd.DataFrame(
+            {
+                "Région": region,
+                "Département": departement,
+                "Ville": ville,
+                "Secteur": secteur,
+                "Métier": metier,
+                "Recrutement": rng.integers(50, 501, n),
+                "Année": np.tile(periode, n // len(periode)),
+            }
+        )
+
+
+def sauvegarder(blocs, chemin):
+    """Écrit les blocs au fil de l'eau, en CSV ou en Parquet selon l'extension."""
+    total = 0
+    if chemin.endswith(".parquet"):
+        writer = None
+        for bloc in blocs:
+            table = pa.Table.from_pandas(bloc, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(chemin, table.schema)
+            writer.write_table(table)
+            total += len(bloc)
+        if writer is not None:
+            writer.close()
+    else:
+        for i, bloc in enumerate(blocs):
+            bloc.to_csv(chemin, index=False, header=i == 0, mode="w" if i == 0 else "a")
+            total += len(bloc)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère des données RH synthétiques")
+    parser.add_argument("--output", default="data/hr_data.csv", help=".csv ou .parquet")
+    parser.add_argument("--scale", type=int, default=1, help="Villes par département")
+    parser.add_argument("--years", type=int, default=0, help="Années supplémentaires")
+    parser.add_argument("--jobs", type=int, default=0, help="Métiers supplémentaires")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    # Générer des données RH synthétiques
+    lieux, postes, periode = produit_cartesien(args.scale, args.years, args.jobs)
+    blocs = generer_blocs(
+        lieux, postes, periode, np.random.default_rng(args.seed), args.chunk_size
+    )
+    total = sauvegarder(blocs, args.output)
+    print(
+        f"✅ Jeu de données RH complet avec toutes les régions et départements français enregistré dans : {args.output} ({total} lignes)"
+    )
@@ -1,6 +1,11 @@
+import os
+import sys
+
 from taipy.gui import Gui
 from pages.explorer.explorer_pd import *
 from pages.root import *
+from pages.explorer.table import register_accessors
+from profiler import SamplingProfiler
 
 pages = {
     "/": root_page,
@@ -10,4 +15,14 @@ pages = {
     "Rapport": "### Rapport",
 }
 
-Gui(pages=pages).run(title="Model RH", dark_mode=False, margin=0)
+gui = Gui(pages=pages)
+# The explorer table pages its rows on the server instead of sending them all
+register_accessors(gui)
+if os.environ.get("EXPLORER_INGEST"):
+    # CSV files dropped in data/incoming are appended to the explorer data and
+    # to data/hr_data.csv
+    watch_incoming(gui)
+if "--profile" in sys.argv:
+    # Writes the sampled stacks of each callback to profiles/<callback>.folded
+    SamplingProfiler().start()
+gui.run(title="Model RH", dark_mode=False, margin=0)
@@ -0,0 +1,119 @@
+import itertools
+
+import pandas as pd
+
+ALL = "Tout"
+FILTER_DIMENSIONS = ["Secteur", "Métier", "Année"]
+GEO_LEVELS = ["Région", "Département", "Ville"]
+
+
+def cube_key(sector, job, year):
+    """Builds the cube key of a filter combination ("Tout" stands for the roll-up)."""
+    return (sector, job, year if year == ALL else int(year))
+
+
+def build_cube(data: pd.DataFrame) -> dict:
+    """Pre-aggregates Recrutement for every Secteur x Métier x Année slice.
+
+    Each (sector, job, year) key, where any member can be "Tout", maps to the
+    totals of that slice at the Ville grain. Région and Département are kept as
+    columns so geographic filters and level roll-ups only touch a few rows.
+    """
+    data = data[data["Recrutement"] > 0]
+    cube = {}
+    for rolled_up in itertools.product([False, True], repeat=len(FILTER_DIMENSIONS)):
+        keys = [dim for dim, rolled in zip(FILTER_DIMENSIONS, rolled_up) if not rolled]
+        grouped = (
+            data.groupby(keys + GEO_LEVELS, observed=True)["Recrutement"]
+            .sum()
+            .reset_index()
+        )
+        if not keys:
+            cube[(ALL, ALL, ALL)] = grouped
+            continue
+        for values, cells in grouped.groupby(keys, observed=True):
+            values = iter(values)
+            key = tuple(ALL if rolled else next(values) for rolled in rolled_up)
+            cube[cube_key(*key)] = cells[GEO_LEVELS + ["Recrutement"]].reset_index(
+                drop=True
+            )
+    return cube
+
+
+def merge_cube(cube: dict, data: pd.DataFrame) -> dict:
+    """Returns a copy of `cube` with the rows of `data` added.
+
+    Only the slices `data` falls into are rebuilt, from their current cells
+    and the new ones; the others are shared with `cube`.
+    """
+    merged = dict(cube)
+    for key, cells in build_cube(data).items():
+        if key in merged:
+            cells = (
+                pd.concat([merged[key], cells], ignore_index=True)
+                .groupby(GEO_LEVELS, observed=True)["Recrutement"]
+                .sum()
+                .reset_index()
+            )
+        merged[key] = cells
+    return merged
+
+
+def select_cells(cube, sector, job, year, region, department):
+    """Returns the Ville-grain cells of a filter combination."""
+    cells = cube.get(cube_key(sector, job, year))
+    if cells is None:
+        return pd.DataFrame({column: [] for column in GEO_LEVELS + ["Recrutement"]})
+    if region != ALL:
+        cells = cells[cells["Région"] == region]
+    if department != ALL:
+        cells = cells[cells["Département"] == department]
+    return cells
+
+
+def group_cells(cells, level):
+    """Rolls cells up to the Recrutement totals per `level`."""
+    return (
+        cells.groupby(level, observed=True)["Recrutement"]
+        .sum()
+        .sort_values(ascending=False)
+        .reset_index()
+    )
+
+
+def rollup_cells(cells):
+    """Totals per Ville, Département and Région in one pass over the cells.
+
+    Each level is rolled up from the totals of the level below, and keeps its
+    parent columns so region and department filters can select its rows.
+    """
+    totals = {}
+    for depth in range(len(GEO_LEVELS), 0, -1):
+        cells = (
+            cells.groupby(GEO_LEVELS[:depth], observed=True)["Recrutement"]
+            .sum()
+            .reset_index()
+        )
+        totals[GEO_LEVELS[depth - 1]] = cells
+    return totals
+
+
+def select_totals(totals, region, department, level):
+    """Returns the Recrutement totals per `level` from the rolled-up totals."""
+    # A department filter on the Région level needs the department totals
+    source = "Département" if department != ALL and level == "Région" else level
+    rows = totals[source]
+    if region != ALL:
+        rows = rows[rows["Région"] == region]
+    if department != ALL:
+        rows = rows[rows["Département"] == department]
+    if source != level:
+        rows = rows.groupby(level, observed=True)["Recrutement"].sum().reset_index()
+    return rows[[level, "Recrutement"]].sort_values(
+        "Recrutement", ascending=False, ignore_index=True
+    )
+
+
+def query_cube(cube, sector, job, year, region, department, level):
+    """Returns the Recrutement totals per `level` for a filter combination."""
+    return group_cells(select_cells(cube, sector, job, year, region, department), level)
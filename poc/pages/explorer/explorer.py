@@ -2,25 +2,44 @@ import polars as pl
 import plotly.express as px
 from taipy.gui import State
 import taipy.gui.builder as tgb
+import functools
 import json
-import time
+import os
+
+from pages.explorer.geo import geojson_file, geojson_tiers, load_geojson
+from pages.explorer.store import scan_hr_csv_pl, scan_hr_data_pl
+from pages.explorer.trace import span, traced, update_bytes
 
 # =====================
 # Load Data
 # =====================
-hr_data = pl.read_csv("data/hr_data.csv")
+# hr_data is a LazyFrame: each query filters and aggregates in one optimized
+# plan and only its result is collected. A CSV file is scanned through its
+# Arrow sidecar, while a directory partitioned by year and region
+# (tools/partition_hr_data.py) is scanned reading only the partitions
+# matching the year and region filters
+HR_DATASET = os.environ.get("HR_DATASET", "data/hr_data.csv")
+if os.path.isdir(HR_DATASET):
+    hr_data = scan_hr_data_pl(HR_DATASET)
+else:
+    hr_data = scan_hr_csv_pl(HR_DATASET)
+# Queries of this page stream through the data instead of holding it all in
+# memory (passed to each collect, leaving the process-wide polars settings)
+ENGINE = "streaming"
+hr_rows = hr_data.select(pl.len()).collect(engine=ENGINE).item()
+
 
 # Filters
-sectors = ["All"] + sorted(
-    hr_data.select("Sector").drop_nulls().unique().to_series().to_list()
-)
-jobs = ["All"] + sorted(
-    hr_data.select("Job Title").drop_nulls().unique().to_series().to_list()
-)
-years = ["All"] + sorted(
-    [int(y) for y in hr_data.select("Year").drop_nulls().unique().to_series().to_list()]
-)
+def list_values(column):
+    values = hr_data.select(pl.col(column).drop_nulls().unique().sort())
+    return ["All"] + values.collect(engine=ENGINE).to_series().to_list()
+
+
+sectors = list_values("Sector")
+jobs = list_values("Job Title")
+years = list_values("Year")
 levels = ["Region", "Department", "City"]
+regions = list_values("Region")
 
 selected_sector = "All"
 selected_job = "All"
@@ -36,31 +55,47 @@ selected_departments = []
 zoom = 4.5
 center = {"lat": 46.5, "lon": 2.5}
 
+# Number of map figures kept in memory, shared by all sessions
+MAP_CACHE_SIZE = 64
+
 # =====================
 # Load GeoJSONs
 # =====================
-with open("geojson/regions.indexed.geojson", encoding="utf-8") as f:
-    region_geojson = json.load(f)
-with open("geojson/departements.indexed.geojson", encoding="utf-8") as f:
-    department_geojson = json.load(f)
-with open("geojson/communes.filtered.geojson", encoding="utf-8") as f:
-    city_geojson = json.load(f)
 with open("geojson/regions_center.json", encoding="utf-8") as f:
     region_centers = json.load(f)
 
+# Layers are only read when a map at their level is first generated, using the
+# simplified tier matching the zoom when tools/simplify_geometry.py made one
 geojson_map = {
-    "Region": (region_geojson, "id"),
-    "Department": (department_geojson, "id"),
-    "City": (city_geojson, "id"),
+    "Region": ("geojson/regions.indexed.geojson", "id"),
+    "Department": ("geojson/departements.indexed.geojson", "id"),
+    "City": ("geojson/communes.filtered.geojson", "id"),
 }
 
+# When True, figures reference the GeoJSON files by URL: Taipy serves them next
+# to main.py and the browser fetches each one once, so map updates only carry
+# the locations and values instead of every polygon.
+GEOJSON_AS_URL = True
+
 
 # =====================
 # Map Generator
 # =====================uv
-def generate_hr_map(data: pl.DataFrame, level, center, zoom):
-    grouped = data.group_by(level).agg(pl.col("Employees Needed").sum()).sort(level)
-    geojson, feature_key = geojson_map[level]
+@traced("generate_hr_map")
+def generate_hr_map(data: pl.LazyFrame, level, center, zoom):
+    with span("group_map") as record:
+        grouped = (
+            data.group_by(level)
+            .agg(pl.col("Employees Needed").sum())
+            .sort(level)
+            .collect(engine=ENGINE)
+        )
+        record["rows_scanned"] = hr_rows
+        record["rows_returned"] = grouped.height
+    layer, feature_key = geojson_map[level]
+    geojson = geojson_file(layer, zoom)
+    if not GEOJSON_AS_URL:
+        geojson = load_geojson(geojson)
     if not isinstance(center, dict):
         center = center._dict
     fig = px.choropleth_map(
@@ -81,60 +116,97 @@ def generate_hr_map(data: pl.DataFrame, level, center, zoom):
     return fig
 
 
+@functools.lru_cache(maxsize=MAP_CACHE_SIZE)
+def cached_hr_map(filters, level, center, zoom):
+    """Generates the map of a filter tuple once for every session.
+
+    Hit and miss counters are available through `cached_hr_map.cache_info()`.
+    """
+    return generate_hr_map(
+        filter_query(*filters), level, dict(zip(("lat", "lon"), center)), zoom
+    )
+
+
 # =====================
 # Apply Filters
 # =====================
+def filter_query(sector, job, year, region, department):
+    # Sessions keep a lazy query over the shared hr_data table, not a copy
+    predicates = [pl.lit(True)]
+    if sector != "All":
+        predicates.append(pl.col("Sector") == sector)
+    if job != "All":
+        predicates.append(pl.col("Job Title") == job)
+    if year != "All":
+        predicates.append(pl.col("Year") == year)
+    if region != "All":
+        predicates.append(pl.col("Region") == region)
+    if department != "All":
+        predicates.append(pl.col("Department") == department)
+    return hr_data.filter(predicates)
+
+
+def current_filters(state):
+    year = state.selected_year
+    return (
+        state.selected_sector,
+        state.selected_job,
+        year if year == "All" else int(year),
+        state.region_selected,
+        state.department_selected,
+    )
+
+
+def center_key(center):
+    return (center["lat"], center["lon"])
+
+
 def apply_filters(state: State):
-    start = time.time()
-    with state:
-        data = hr_data.clone()
-        if state.selected_sector != "All":
-            data = data.filter(pl.col("Sector") == state.selected_sector)
-        if state.selected_job != "All":
-            data = data.filter(pl.col("Job Title") == state.selected_job)
-        if state.selected_year != "All":
-            data = data.filter(pl.col("Year") == int(state.selected_year))
-        if state.region_selected != "All":
-            data = data.filter(pl.col("Region") == state.region_selected)
-        if state.department_selected != "All":
-            data = data.filter(pl.col("Department") == state.department_selected)
-
-        state.filtered_data = data
-
-        if data.height > 0:
-            chart = data.group_by(state.selected_level).agg(
-                pl.col("Employees Needed").sum()
-            )
-            chart = chart.sort("Employees Needed", descending=True)
-            state.chart_data = chart
+    with state, span("apply_filters") as record:
+        filters = current_filters(state)
+        data = filter_query(*filters)
+        changes = {"filtered_data": data}
+
+        with span("collect_views") as views:
+            chart, departments = collect_views(data, state.selected_level)
+            views["rows_scanned"] = hr_rows
+            views["rows_returned"] = chart.height + len(departments)
+        changes["departments"] = departments
+        if chart.height > 0:
+            # Converted once per update, not on every render of the chart
+            changes["chart_data"] = chart.to_pandas()
 
+            center = center_key(state.center)
             if state.selected_level == "Region":
-                state.map_fig_regions = generate_hr_map(
-                    data, "Region", state.center, state.zoom
+                changes["map_fig_regions"] = cached_hr_map(
+                    filters, "Region", center, state.zoom
                 )
             if state.selected_level == "Department":
-                state.map_fig_departments = generate_hr_map(
-                    data, "Department", state.center, state.zoom
+                changes["map_fig_departments"] = cached_hr_map(
+                    filters, "Department", center, state.zoom
                 )
             if state.selected_level == "City":
-                state.map_fig_communes = generate_hr_map(
-                    data, "City", state.center, state.zoom
+                changes["map_fig_communes"] = cached_hr_map(
+                    filters, "City", center, state.zoom
                 )
 
         else:
             import pandas as pd
 
-            state.chart_data = pd.DataFrame()
-            state.map_fig_regions = None
-            state.map_fig_departments = None
-            state.map_fig_communes = None
+            changes["chart_data"] = pd.DataFrame()
+            changes["map_fig_regions"] = None
+            changes["map_fig_departments"] = None
+            changes["map_fig_communes"] = None
 
-    print(f"Filters applied in {time.time() - start:.2f} seconds")
+        for name, value in changes.items():
+            setattr(state, name, value)
+        record["bytes"] = update_bytes(changes)
 
 
 # =====================
 # Map Click Handler
 # =====================
+@traced("on_change")
 def on_change(state: State, var_name, var_value):
     with state:
         if var_name == "selected_regions" and isinstance(var_value, list) and var_value:
@@ -153,15 +225,60 @@ def on_change(state: State, var_name, var_value):
             apply_filters(state)
 
 
+def group_chart(data: pl.LazyFrame, level):
+    return (
+        data.group_by(level)
+        .agg(pl.col("Employees Needed").sum())
+        .sort("Employees Needed", descending=True)
+    )
+
+
+def list_departments(data: pl.LazyFrame):
+    return data.select(pl.col("Department").drop_nulls().unique().sort())
+
+
+def collect_views(data: pl.LazyFrame, level):
+    """Returns the chart data and the departments of a filtered query.
+
+    Both queries are collected together: polars runs them in parallel and
+    scans the filtered rows once for the two of them.
+    """
+    chart, departments = pl.collect_all(
+        [group_chart(data, level), list_departments(data)], engine=ENGINE
+    )
+    return chart, ["All"] + departments.to_series().cast(pl.String).to_list()
+
+
+def view_total(data: pl.LazyFrame):
+    return data.select(pl.col("Employees Needed").sum()).collect(engine=ENGINE).item()
+
+
 # =====================
 # Initial Data
 # =====================
-filtered_data = hr_data.clone()
-chart_data = filtered_data
+filtered_data = hr_data
+chart_data, departments = collect_views(filtered_data, selected_level)
+chart_data = chart_data.to_pandas()
+
+# Other levels get their first figure when the user switches to them
+initial_filters = ("All",) * 5
+map_fig_regions = cached_hr_map(initial_filters, "Region", center_key(center), zoom)
+map_fig_departments = None
+map_fig_communes = None
+
+
+def warm_up():
+    """Loads every layer and builds the unfiltered map of each level ahead of use."""
+    for level in levels:
+        if not GEOJSON_AS_URL:
+            for _, tier in geojson_tiers(geojson_map[level][0]):
+                load_geojson(tier)
+            load_geojson(geojson_map[level][0])
+        cached_hr_map(initial_filters, level, center_key(center), zoom)
+
 
-map_fig_regions = generate_hr_map(hr_data, "Region", center, zoom)
-map_fig_departments = generate_hr_map(hr_data, "Department", center, zoom)
-map_fig_communes = generate_hr_map(hr_data, "City", center, zoom)
+if os.environ.get("EXPLORER_WARM_UP"):
+    warm_up()
 
 # =====================
 # GUI Layout
@@ -171,7 +288,7 @@ with tgb.Page() as explorer_page:
         with tgb.part():
             tgb.metric(
                 label="Total Employees Needed",
-                value=lambda filtered_data: filtered_data["Employees Needed"].sum(),
+                value=lambda filtered_data: view_total(filtered_data),
                 type="none",
                 class_name="metric",
             )
@@ -209,14 +326,7 @@ with tgb.Page() as explorer_page:
                     tgb.selector(
                         label="Region",
                         value="{region_selected}",
-                        lov=lambda hr_data: ["All"]
-                        + sorted(
-                            hr_data.select("Region")
-                            .drop_nulls()
-                            .unique()
-                            .to_series()
-                            .to_list()
-                        ),
+                        lov=regions,
                         dropdown=True,
                         on_change=apply_filters,
                     )
@@ -224,14 +334,7 @@ with tgb.Page() as explorer_page:
                     tgb.selector(
                         label="Department",
                         value="{department_selected}",
-                        lov=lambda filtered_data: ["All"]
-                        + sorted(
-                            filtered_data.select("Department")
-                            .drop_nulls()
-                            .unique()
-                            .to_series()
-                            .to_list()
-                        ),
+                        lov="{departments}",
                         dropdown=True,
                         on_change=apply_filters,
                     )
@@ -253,9 +356,9 @@ with tgb.Page() as explorer_page:
             )
 
             tgb.chart(
-                data="{chart_data.to_pandas()}",
+                data="{chart_data}",
                 x="{selected_level}",
                 y="Employees Needed",
                 type="bar",
             )
-            tgb.table(data="{filtered_data.to_pandas()}", page_size=10)
+            tgb.table(data="{filtered_data}", page_size=10)
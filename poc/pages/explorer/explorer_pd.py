@@ -1,21 +1,109 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from taipy.gui import State, notify
+from taipy.gui import State, broadcast_callback, get_state_id, invoke_callback, notify
 import taipy.gui.builder as tgb
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import functools
+import itertools
 import json
+import os
+import threading
 import time
+import traceback
+
+from pages.explorer.cube import (
+    ALL,
+    FILTER_DIMENSIONS,
+    build_cube,
+    cube_key,
+    merge_cube,
+    query_cube,
+    rollup_cells,
+    select_cells,
+    select_totals,
+)
+from pages.explorer.geo import geojson_file, geojson_tiers, load_geojson
+from pages.explorer.store import append_hr_rows, load_hr_data
+from pages.explorer.table import RowView
+from pages.explorer.trace import span, traced, update_bytes
 
 # =====================
 # Load Data
 # =====================
-hr_data = pd.read_csv("data/hr_data.csv")
+HR_DATA_FILE = "data/hr_data.csv"
+
+# Number of map figures kept in memory, shared by all sessions
+MAP_CACHE_SIZE = 64
+
+# Columns compared by the filters, in the order of current_filters(), as the
+# dictionary codes of the categorical columns or the years themselves
+FILTER_COLUMNS = FILTER_DIMENSIONS + ["Région", "Département"]
+
+
+def index_filters(data):
+    return {
+        column: (
+            data[column].cat.codes.to_numpy()
+            if isinstance(data[column].dtype, pd.CategoricalDtype)
+            else data[column].to_numpy()
+        )
+        for column in FILTER_COLUMNS
+    }
+
+
+def list_values(data):
+    """Returns the sectors, jobs, years, regions and departments of `data`."""
+    return (
+        ["Tout"] + data["Secteur"].cat.categories.tolist(),
+        ["Tout"] + data["Métier"].cat.categories.tolist(),
+        ["Tout"] + sorted([int(y) for y in data["Année"].dropna().unique()]),
+        ["Tout"] + data["Région"].cat.categories.tolist(),
+        ["Tout"] + data["Département"].cat.categories.tolist(),
+    )
+
+
+class HRSnapshot:
+    """The HR data with its cube, filter arrays, rows and lists of values.
+
+    A snapshot is never modified: ingestion publishes a new one with a single
+    assignment of `hr_snapshot`, and each update reads that variable once, so
+    it doesn't mix the category codes or rows of different data.
+    """
+
+    def __init__(self, data, cube, filter_arrays, base_rows):
+        self.data = data
+        self.cube = cube
+        self.filter_arrays = filter_arrays
+        # Rows with a non-zero Recrutement, the ones filters start from
+        self.base_rows = base_rows
+        self.lists = list_values(data)
+        # Maps of this data, dropped with it when ingestion replaces it, even
+        # the ones a worker still on this snapshot adds afterwards
+        self.maps = functools.lru_cache(maxsize=MAP_CACHE_SIZE)(self.build_map)
+
+    def build_map(self, filters, level, center, zoom):
+        chart_data = query_cube(self.cube, *filters, level)
+        return generate_hr_map(
+            chart_data, level, dict(zip(("lat", "lon"), center)), zoom
+        )
+
+
+def load_snapshot(path):
+    data = load_hr_data(path)
+    return HRSnapshot(
+        data,
+        build_cube(data),
+        index_filters(data),
+        np.flatnonzero((data["Recrutement"] > 0).to_numpy()),
+    )
+
+
+hr_snapshot = load_snapshot(HR_DATA_FILE)
 
 # Filters
-sectors = ["Tout"] + sorted(hr_data["Secteur"].dropna().unique().tolist())
-jobs = ["Tout"] + sorted(hr_data["Métier"].dropna().unique().tolist())
-years = ["Tout"] + sorted([int(y) for y in hr_data["Année"].dropna().unique()])
-regions = ["Tout"] + sorted(hr_data["Région"].dropna().unique().tolist())
-departments = ["Tout"] + sorted(hr_data["Département"].dropna().unique().tolist())
+sectors, jobs, years, regions, departments = hr_snapshot.lists
 levels = ["Région", "Département", "Ville"]
 
 selected_sector = "Tout"
@@ -34,46 +122,95 @@ center = {"lat": 46.5, "lon": 2.5}
 # =====================
 # Load GeoJSONs
 # =====================
-with open("geojson/regions.indexed.geojson", encoding="utf-8") as f:
-    region_geojson = json.load(f)
-with open("geojson/departements.indexed.geojson", encoding="utf-8") as f:
-    department_geojson = json.load(f)
-with open("geojson/communes.filtered.geojson", encoding="utf-8") as f:
-    city_geojson = json.load(f)
 with open("geojson/regions_center.json", encoding="utf-8") as f:
     region_centers = json.load(f)
 
+# Layers are only read when a map at their level is first generated, using the
+# simplified tier matching the zoom when tools/simplify_geometry.py made one
 geojson_map = {
-    "Région": (region_geojson, "id"),
-    "Département": (department_geojson, "id"),
-    "Ville": (city_geojson, "id"),
+    "Région": ("geojson/regions.indexed.geojson", "id"),
+    "Département": ("geojson/departements.indexed.geojson", "id"),
+    "Ville": ("geojson/communes.filtered.geojson", "id"),
 }
 
+# When True, figures reference the GeoJSON files by URL: Taipy serves them next
+# to main.py and the browser fetches each one once, so map updates only carry
+# the locations and values instead of every polygon.
+GEOJSON_AS_URL = True
+
+
+# =====================
+# Filtered Views
+# =====================
+# Sessions only hold the positions of their rows in the shared HR data, and
+# the table reads its visible page from them (see table.register_accessors).
+# Rows are only ever appended, so positions stay valid in later snapshots.
+def filtered_view(rows):
+    return RowView(hr_snapshot.data, rows)
+
+
+def view_total(rows):
+    return hr_snapshot.data["Recrutement"].to_numpy()[rows].sum()
+
 
-def filter_data(state):
-    data = hr_data.copy()
-    mask = data["Recrutement"] > 0
-    if state.selected_sector != "Tout":
-        mask &= data["Secteur"] == state.selected_sector
-    if state.selected_job != "Tout":
-        mask &= data["Métier"] == state.selected_job
-    if state.selected_year != "Tout":
-        mask &= data["Année"] == int(state.selected_year)
-    if state.region_selected != "Tout":
-        mask &= data["Région"] == state.region_selected
-    if state.department_selected != "Tout":
-        mask &= data["Département"] == state.department_selected
+def view_categories(data, column, rows):
+    codes = np.unique(data[column].cat.codes.to_numpy()[rows])
+    return data[column].cat.categories[codes[codes >= 0]].tolist()
 
-    data = data[mask]
-    state.filtered_data = data
+
+def encode_filter(data, column, value):
+    if not isinstance(data[column].dtype, pd.CategoricalDtype):
+        return int(value)
+    categories = data[column].cat.categories
+    return categories.get_loc(value) if value in categories else -2
+
+
+def filter_data(state, snapshot):
+    """Updates the session's rows for the current filters.
+
+    When every filter either kept its value or went from "Tout" to a value,
+    only the rows already selected are tested, against the changed filters.
+    """
+    filters = current_filters(state)
+    previous = state.applied_filters
+    if filters == previous:
+        return
+    with span("filter_data") as record:
+        if all(old in (ALL, new) for old, new in zip(previous, filters)):
+            rows = state.filtered_rows
+            changes = [
+                (column, new)
+                for column, old, new in zip(FILTER_COLUMNS, previous, filters)
+                if old != new
+            ]
+        else:
+            rows = snapshot.base_rows
+            changes = [
+                (column, value)
+                for column, value in zip(FILTER_COLUMNS, filters)
+                if value != ALL
+            ]
+        record["rows_scanned"] = 0
+        for column, value in changes:
+            record["rows_scanned"] += len(rows)
+            code = encode_filter(snapshot.data, column, value)
+            rows = rows[snapshot.filter_arrays[column][rows] == code]
+        record["rows_returned"] = len(rows)
+
+        state.filtered_rows = rows
+        state.applied_filters = filters
 
 
 # =====================
 # Map Generator
 # =====================
+@traced("generate_hr_map")
 def generate_hr_map(data, level, center, zoom):
     grouped = data
-    geojson, feature_key = geojson_map[level]
+    layer, feature_key = geojson_map[level]
+    geojson = geojson_file(layer, zoom)
+    if not GEOJSON_AS_URL:
+        geojson = load_geojson(geojson)
     if not isinstance(center, dict):
         center = center._dict
     fig = px.choropleth_map(
@@ -95,15 +232,56 @@ def generate_hr_map(data, level, center, zoom):
     return fig
 
 
-def generate_charts(state):
-    state.chart_data = (
-        state.filtered_data.groupby(state.selected_level)["Recrutement"]
-        .sum()
-        .sort_values(ascending=False)
-        .reset_index()
+def cached_hr_map(filters, level, center, zoom, snapshot=None):
+    """Generates the map of a filter tuple once for every session.
+
+    Maps are cached by their snapshot (the current one by default). Hit and
+    miss counters are available through `hr_snapshot.maps.cache_info()`.
+    """
+    return (snapshot or hr_snapshot).maps(filters, level, center, zoom)
+
+
+def current_filters(state):
+    return (
+        *cube_key(state.selected_sector, state.selected_job, state.selected_year),
+        state.region_selected,
+        state.department_selected,
     )
-    map_fig = generate_hr_map(
-        state.chart_data, state.selected_level, state.center, state.zoom
+
+
+def center_key(center):
+    return (center["lat"], center["lon"])
+
+
+# Session variables holding the totals of each level for the current
+# (sector, job, year), rolled up together by rollup_cells()
+level_totals = {
+    "Région": "region_totals",
+    "Département": "department_totals",
+    "Ville": "city_totals",
+}
+
+
+@traced("generate_charts")
+def generate_charts(state, snapshot):
+    # Switching levels or drilling down only selects rows from the totals
+    filters = current_filters(state)
+    if filters[:3] != state.totals_key:
+        with span("rollup_cells") as record:
+            cells = select_cells(snapshot.cube, *filters[:3], ALL, ALL)
+            totals = rollup_cells(cells)
+            record["rows_scanned"] = len(cells)
+            record["rows_returned"] = sum(len(rows) for rows in totals.values())
+        for level, name in level_totals.items():
+            setattr(state, name, totals[level])
+        state.totals_key = filters[:3]
+    with span("select_totals") as record:
+        totals = {level: getattr(state, name) for level, name in level_totals.items()}
+        state.chart_data = select_totals(totals, *filters[3:], state.selected_level)
+        record["rows_scanned"] = len(totals[state.selected_level])
+        record["rows_returned"] = len(state.chart_data)
+    map_fig = cached_hr_map(
+        filters, state.selected_level, center_key(state.center), state.zoom, snapshot
     )
     if state.selected_level == "Région":
         state.map_fig_regions = map_fig
@@ -113,37 +291,197 @@ def generate_charts(state):
         state.map_fig_communes = map_fig
 
 
-def change_dynamic_lov(state):
-    jobs = state.filtered_data["Métier"].unique().tolist()
-    if len(jobs) > 1:
-        state.jobs = ["Tout"] + jobs
+def change_dynamic_lov(state, snapshot):
+    with span("change_dynamic_lov") as record:
+        jobs = view_categories(snapshot.data, "Métier", state.filtered_rows)
+        if len(jobs) > 1:
+            state.jobs = ["Tout"] + jobs
 
-    departements = state.filtered_data["Département"].unique().tolist()
-    if len(departements) > 1:
-        state.departments = ["Tout"] + departements
+        departements = view_categories(
+            snapshot.data, "Département", state.filtered_rows
+        )
+        if len(departements) > 1:
+            state.departments = ["Tout"] + departements
+        record["rows_scanned"] = 2 * len(state.filtered_rows)
+        record["rows_returned"] = len(jobs) + len(departements)
 
 
 # =====================
 # Apply Filters
 # =====================
+# Filtering, aggregation and figure building run on a pool of this many
+# workers so a slow request doesn't block the Taipy callback thread; with 0
+# they run in the callback itself
+EXPLORER_WORKERS = int(os.environ.get("EXPLORER_WORKERS", "4"))
+# Changes of a session closer than this many seconds are applied together
+EXPLORER_DEBOUNCE = float(os.environ.get("EXPLORER_DEBOUNCE", "0.3"))
+
+# Session variables read by update_charts(), and the ones it may change
+SESSION_INPUTS = [
+    "selected_sector",
+    "selected_job",
+    "selected_year",
+    "region_selected",
+    "department_selected",
+    "selected_level",
+    "center",
+    "zoom",
+]
+SESSION_OUTPUTS = [
+    "applied_filters",
+    "filtered_rows",
+    "totals_key",
+    *level_totals.values(),
+    "chart_data",
+    "map_fig_regions",
+    "map_fig_departments",
+    "map_fig_communes",
+    "jobs",
+    "departments",
+]
+
+_executor = ThreadPoolExecutor(EXPLORER_WORKERS) if EXPLORER_WORKERS else None
+_request_ids = itertools.count()
+# Entries of a session are removed once its latest request is published
+_requests_lock = threading.Lock()
+_latest_requests = {}
+_pending_requests = {}
+_debounce_timers = {}
+
+
+def update_charts(session):
+    """Updates the rows, totals, figures and lists of a session.
+
+    `session` is either a State or a snapshot of its variables. Returns False
+    when no data matches the filters.
+    """
+    snapshot = hr_snapshot
+    filter_data(session, snapshot)
+
+    if len(session.filtered_rows) > 0:
+        generate_charts(session, snapshot)
+        change_dynamic_lov(session, snapshot)
+        return True
+    session.chart_data = pd.DataFrame()
+    session.map_fig_regions = None
+    session.map_fig_departments = None
+    session.map_fig_communes = None
+    return False
+
+
 def apply_filters(state: State):
-    with state:
-        filter_data(state)
+    if EXPLORER_DEBOUNCE <= 0:
+        submit_update(state)
+        return
 
-        if not state.filtered_data.empty:
-            generate_charts(state)
-            change_dynamic_lov(state)
-        else:
+    state_id = get_state_id(state)
+    # Results still in flight are outdated by this change, and the update is
+    # postponed until the session's changes stop for EXPLORER_DEBOUNCE
+    timer = threading.Timer(
+        EXPLORER_DEBOUNCE, flush_update, [state.get_gui(), state_id]
+    )
+    timer.daemon = True
+    with _requests_lock:
+        if _executor is not None:
+            _latest_requests[state_id] = next(_request_ids)
+        if (previous := _debounce_timers.get(state_id)) is not None:
+            previous.cancel()
+        _debounce_timers[state_id] = timer
+    timer.start()
+
+
+def flush_update(gui, state_id):
+    # Runs in the timer's thread, which a later change may have replaced
+    with _requests_lock:
+        if _debounce_timers.get(state_id) is threading.current_thread():
+            del _debounce_timers[state_id]
+    invoke_callback(gui, state_id, submit_update)
+
+
+def submit_update(state: State):
+    if _executor is None:
+        with state, span("apply_filters") as record:
+            before = {name: getattr(state, name) for name in SESSION_OUTPUTS}
+            found = update_charts(state)
+            record["bytes"] = update_bytes(changed_outputs(state, before))
+            if not found:
+                notify(state, "error", "No data available for the selected filters.")
+        return
+
+    state_id = get_state_id(state)
+    session = SimpleNamespace(
+        **{name: getattr(state, name) for name in SESSION_INPUTS + SESSION_OUTPUTS}
+    )
+    with _requests_lock:
+        request_id = next(_request_ids)
+        _latest_requests[state_id] = request_id
+        # A request of this session still waiting for a worker is now stale
+        if (pending := _pending_requests.get(state_id)) is not None:
+            pending.cancel()
+        _pending_requests[state_id] = _executor.submit(
+            run_update, state.get_gui(), state_id, request_id, session
+        )
+
+
+def finish_request(state_id, request_id):
+    """Forgets the requests of a session once its latest one is done."""
+    with _requests_lock:
+        if _latest_requests.get(state_id) == request_id:
+            _latest_requests.pop(state_id, None)
+            _pending_requests.pop(state_id, None)
+
+
+def changed_outputs(session, before):
+    return {
+        name: getattr(session, name)
+        for name in SESSION_OUTPUTS
+        if getattr(session, name) is not before[name]
+    }
+
+
+def run_update(gui, state_id, request_id, session):
+    if _latest_requests.get(state_id) != request_id:
+        return
+    try:
+        with span("apply_filters"):
+            before = {name: getattr(session, name) for name in SESSION_OUTPUTS}
+            found = update_charts(session)
+            changes = changed_outputs(session, before)
+    except Exception as e:
+        # The future holding the exception is never read: report it here
+        print(f"Couldn't update the charts of {state_id}:")
+        traceback.print_exc()
+        invoke_callback(gui, state_id, report_update_error, [request_id, e])
+        return
+    invoke_callback(gui, state_id, publish_update, [request_id, changes, found])
+
+
+def publish_update(state: State, request_id, changes, found):
+    # Results of a request made before the latest one are dropped
+    state_id = get_state_id(state)
+    if _latest_requests.get(state_id) != request_id:
+        return
+    with state, span("publish_update") as record:
+        for name, value in changes.items():
+            setattr(state, name, value)
+        record["bytes"] = update_bytes(changes)
+        if not found:
             notify(state, "error", "No data available for the selected filters.")
-            state.chart_data = pd.DataFrame()
-            state.map_fig_regions = None
-            state.map_fig_departments = None
-            state.map_fig_communes = None
+    finish_request(state_id, request_id)
+
+
+def report_update_error(state: State, request_id, error):
+    state_id = get_state_id(state)
+    if _latest_requests.get(state_id) != request_id:
+        return
+    notify(state, "error", f"Couldn't update the charts: {error}")
+    finish_request(state_id, request_id)
 
 
 # =====================
 # Map Click Handler
 # =====================
+@traced("on_change")
 def on_change(state: State, var_name, var_value):
     with state:
         if var_name == "selected_regions" and isinstance(var_value, list) and var_value:
@@ -165,17 +503,186 @@ def on_change(state: State, var_name, var_value):
 # =====================
 # Initial Data
 # =====================
-filtered_data = hr_data.copy()
-chart_data = (
-    filtered_data.groupby(selected_level)["Recrutement"]
-    .sum()
-    .sort_values(ascending=False)
-    .reset_index()
+initial_filters = (
+    *cube_key(selected_sector, selected_job, selected_year),
+    region_selected,
+    department_selected,
 )
+applied_filters = initial_filters
+totals_key = initial_filters[:3]
+
+
+def set_initial_data():
+    """Sets the rows, totals and figures new sessions start from."""
+    global filtered_rows, region_totals, department_totals, city_totals
+    global chart_data, map_fig_regions, map_fig_departments, map_fig_communes
+    snapshot = hr_snapshot
+    filtered_rows = snapshot.base_rows
+    initial_totals = rollup_cells(select_cells(snapshot.cube, *totals_key, ALL, ALL))
+    region_totals = initial_totals["Région"]
+    department_totals = initial_totals["Département"]
+    city_totals = initial_totals["Ville"]
+    chart_data = select_totals(initial_totals, *initial_filters[3:], selected_level)
+
+    # Other levels get their first figure when the user switches to them
+    map_fig_regions = cached_hr_map(
+        initial_filters, "Région", center_key(center), zoom, snapshot
+    )
+    map_fig_departments = None
+    map_fig_communes = None
+
+
+set_initial_data()
+
+
+def warm_up():
+    """Loads every layer and builds the unfiltered map of each level ahead of use."""
+    for level in levels:
+        if not GEOJSON_AS_URL:
+            for _, tier in geojson_tiers(geojson_map[level][0]):
+                load_geojson(tier)
+            load_geojson(geojson_map[level][0])
+        cached_hr_map(initial_filters, level, center_key(center), zoom, hr_snapshot)
+
+
+if os.environ.get("EXPLORER_WARM_UP"):
+    warm_up()
+
+
+# =====================
+# Ingestion
+# =====================
+# CSV files with the columns of hr_data.csv dropped here (written elsewhere,
+# then moved in) are appended to the data while the application runs
+INCOMING_DIR = "data/incoming"
+INGEST_INTERVAL = 10
+
+_ingest_lock = threading.Lock()
+
+
+def append_hr_data(rows: pd.DataFrame, path=None):
+    """Adds rows to the shared data, cube and lists without reloading them.
+
+    Sessions keep their row positions, which appending doesn't move, until
+    refresh_session() filters them again. With a `path`, the rows are saved
+    to that CSV file before the new data is published: if either step
+    fails, neither the file nor the data have the rows.
+    """
+    global hr_snapshot
+    global sectors, jobs, years, regions, departments
+    with _ingest_lock:
+        current = hr_snapshot
+        offset = len(current.data)
+        data = append_hr_rows(current.data, rows)
+        added = data.iloc[offset:]
+        added_rows = np.flatnonzero((added["Recrutement"] > 0).to_numpy())
+        snapshot = HRSnapshot(
+            data,
+            merge_cube(current.cube, added),
+            index_filters(data),
+            np.concatenate([current.base_rows, offset + added_rows]),
+        )
+        if path is not None:
+            append_csv(rows, path)
+        hr_snapshot = snapshot
+        sectors, jobs, years, regions, departments = hr_snapshot.lists
+        set_initial_data()
+    return len(added)
+
+
+def append_csv(rows: pd.DataFrame, path):
+    size = os.path.getsize(path)
+    try:
+        rows.to_csv(path, mode="a", header=False, index=False)
+    except Exception:
+        # Drops the rows written before the error
+        with open(path, "r+b") as file:
+            file.truncate(size)
+        raise
+
+
+def ingest_file(path):
+    """Appends a CSV file to the data and to hr_data.csv, so restarts keep its rows."""
+    rows = pd.read_csv(path)
+    hr_data = hr_snapshot.data
+    missing = set(hr_data.columns) - set(rows.columns)
+    if missing:
+        raise ValueError(f"missing columns {', '.join(sorted(missing))}")
+    # Checked before anything is written
+    rows = rows[hr_data.columns].astype(
+        {column: hr_data[column].dtype for column in ["Recrutement", "Année"]}
+    )
+    return append_hr_data(rows, HR_DATA_FILE)
+
+
+def refresh_session(state: State, count):
+    """Shows the appended rows in a session, keeping its filters."""
+    sectors, _, years, regions, _ = hr_snapshot.lists
+    with state:
+        state.sectors = sectors
+        state.years = years
+        state.regions = regions
+        # The rows are filtered again from all of them, and the totals rolled up
+        state.applied_filters = (None,) * len(FILTER_COLUMNS)
+        state.totals_key = None
+    apply_filters(state)
+    notify(state, "info", f"{count} nouvelles lignes ajoutées aux données.")
+
+
+def watch_incoming(gui, directory=INCOMING_DIR, interval=INGEST_INTERVAL):
+    """Ingests the CSV files of `directory` every `interval` seconds.
+
+    Ingested files are moved to `<directory>/done`, files that can't be read
+    to `<directory>/failed`, and every session is refreshed.
+    """
+    for subdirectory in ("done", "failed"):
+        os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+
+    def move(name, subdirectory):
+        try:
+            os.replace(
+                os.path.join(directory, name),
+                os.path.join(directory, subdirectory, name),
+            )
+            return True
+        except OSError as e:
+            print(f"Couldn't move {name} to {subdirectory}: {e}")
+            return False
+
+    def watch():
+        # Ingested files that couldn't be moved, so they aren't ingested again
+        ingested = set()
+        while True:
+            time.sleep(interval)
+            try:
+                names = sorted(os.listdir(directory))
+            except OSError as e:
+                print(f"Couldn't list {directory}: {e}")
+                continue
+            for name in names:
+                path = os.path.join(directory, name)
+                if not name.endswith(".csv") or not os.path.isfile(path):
+                    continue
+                if name in ingested:
+                    continue
+                # Any error only fails this file, the thread keeps watching
+                try:
+                    count = ingest_file(path)
+                except Exception as e:
+                    print(f"Couldn't ingest {path}: {e!r}")
+                    move(name, "failed")
+                    continue
+                if not move(name, "done"):
+                    ingested.add(name)
+                print(f"Ingested {count} rows from {path}")
+                try:
+                    broadcast_callback(gui, refresh_session, [count])
+                except Exception:
+                    print("Couldn't refresh the sessions:")
+                    traceback.print_exc()
+
+    threading.Thread(target=watch, name="hr-ingest", daemon=True).start()
 
-map_fig_regions = generate_hr_map(filtered_data, "Région", center, zoom)
-map_fig_departments = generate_hr_map(filtered_data, "Département", center, zoom)
-map_fig_communes = generate_hr_map(filtered_data, "Ville", center, zoom)
 
 # =====================
 # GUI Layout
@@ -187,25 +694,25 @@ with tgb.Page() as explorer_page:
         with tgb.part():
             tgb.metric(
                 title="Recrutement logement 2025-2035",
-                value=lambda filtered_data: filtered_data["Recrutement"].sum(),
+                value=lambda filtered_rows: view_total(filtered_rows),
                 type="none",
                 class_name="metric",
             )
             tgb.metric(
                 title="Recrutement tertiaire 2025-2035",
-                value=lambda filtered_data: filtered_data["Recrutement"].sum(),
+                value=lambda filtered_rows: view_total(filtered_rows),
                 type="none",
                 class_name="metric",
             )
             tgb.metric(
                 title="Recrutement aménagements<br> urbains 2025-2035",
-                value=lambda filtered_data: filtered_data["Recrutement"].sum(),
+                value=lambda filtered_rows: view_total(filtered_rows),
                 type="none",
                 class_name="metric",
             )
             tgb.metric(
                 title="Nombre formées 2025-2035",
-                value=lambda filtered_data: filtered_data["Recrutement"].sum(),
+                value=lambda filtered_rows: view_total(filtered_rows),
                 type="none",
                 class_name="metric",
             )
@@ -216,7 +723,7 @@ with tgb.Page() as explorer_page:
                     tgb.selector(
                         label="Secteur",
                         value="{selected_sector}",
-                        lov=sectors,
+                        lov="{sectors}",
                         dropdown=True,
                         on_change=apply_filters,
                     )
@@ -230,7 +737,7 @@ with tgb.Page() as explorer_page:
                     tgb.selector(
                         label="Année",
                         value="{selected_year}",
-                        lov=years,
+                        lov="{years}",
                         dropdown=True,
                         on_change=apply_filters,
                     )
@@ -255,7 +762,7 @@ with tgb.Page() as explorer_page:
                 value="{selected_level}",
                 lov=levels,
                 dropdown=True,
-                on_change=generate_charts,
+                on_change=apply_filters,
             )
 
             tgb.chart(
@@ -281,4 +788,6 @@ with tgb.Page() as explorer_page:
                 type="bar",
                 rebuild=True,
             )
-            tgb.table(data="{filtered_data}", page_size=10)
+            tgb.table(
+                data=lambda filtered_rows: filtered_view(filtered_rows), page_size=10
+            )
@@ -0,0 +1,34 @@
+import functools
+import glob
+import json
+import os
+
+
+@functools.cache
+def geojson_tiers(path):
+    """Lists the simplified versions of a layer as (max zoom, path), coarsest first.
+
+    Tiers are the `<layer>.z<max_zoom>.geojson` files written next to the layer
+    by tools/simplify_geometry.py.
+    """
+    stem, ext = os.path.splitext(path)
+    tiers = []
+    for tier in glob.glob(f"{glob.escape(stem)}.z*{ext}"):
+        max_zoom = tier[len(stem) + 2 : -len(ext)]
+        if max_zoom.isdigit():
+            tiers.append((int(max_zoom), tier.replace(os.sep, "/")))
+    return sorted(tiers)
+
+
+def geojson_file(path, zoom):
+    """Returns the coarsest version of a layer that is detailed enough for `zoom`."""
+    for max_zoom, tier in geojson_tiers(path):
+        if zoom <= max_zoom:
+            return tier
+    return path
+
+
+@functools.cache
+def load_geojson(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
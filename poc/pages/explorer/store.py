@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Dimension columns, stored as integer codes over one shared sorted dictionary
+HR_DIMENSIONS = ["Région", "Département", "Ville", "Secteur", "Métier"]
+HR_DIMENSIONS_EN = ["Region", "Department", "City", "Sector", "Job Title"]
+
+
+def read_csv_cached(path: str, dimensions=()) -> pa.Table:
+    """Reads a CSV file through an Arrow IPC sidecar (`<path>.arrow`).
+
+    The CSV stays the source of truth: the sidecar records its size,
+    modification time and dictionary columns, and is rewritten when they
+    change. Otherwise it is memory-mapped instead of parsing the text again.
+    """
+    stat = os.stat(path)
+    source = f"{stat.st_size}:{stat.st_mtime_ns}:{','.join(dimensions)}".encode()
+    sidecar = f"{path}.arrow"
+    try:
+        table = pa.ipc.open_file(pa.memory_map(sidecar)).read_all()
+        if (table.schema.metadata or {}).get(b"source") == source:
+            return table
+    except (OSError, pa.ArrowInvalid):
+        pass
+
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    table = pa_csv.read_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=dict.fromkeys(dimensions, dictionary)
+        ),
+    )
+    table = table.unify_dictionaries().replace_schema_metadata({"source": source})
+    try:
+        with pa.OSFile(f"{sidecar}.tmp", "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(f"{sidecar}.tmp", sidecar)
+    except OSError as e:
+        print(f"Couldn't write {sidecar}: {e}")
+    return table
+
+
+def load_hr_data(path: str, dimensions=HR_DIMENSIONS) -> pd.DataFrame:
+    """Loads the HR dataset with the dimension columns as pandas Categoricals.
+
+    Equality filters on these columns compare the integer codes, and every
+    filtered copy shares the categories instead of duplicating the strings.
+    """
+    data = read_csv_cached(path, dimensions).to_pandas()
+    for dim in dimensions:
+        data[dim] = data[dim].cat.reorder_categories(sorted(data[dim].cat.categories))
+    return data
+
+
+def append_hr_rows(
+    data: pd.DataFrame, rows: pd.DataFrame, dimensions=HR_DIMENSIONS
+) -> pd.DataFrame:
+    """Returns `data` followed by `rows`, with the same sorted Categoricals.
+
+    Rows keep their positions. Codes only change when `rows` brings new
+    values, as the categories stay sorted.
+    """
+    data = data.copy(deep=False)
+    rows = rows[data.columns].copy()
+    for dim in dimensions:
+        known = data[dim].cat.categories
+        categories = known.union(rows[dim].dropna().unique()).sort_values()
+        if len(categories) != len(known):
+            data[dim] = data[dim].cat.set_categories(categories)
+        rows[dim] = pd.Categorical(rows[dim], categories=categories)
+    return pd.concat([data, rows], ignore_index=True)
+
+
+def scan_hr_csv_pl(path: str, dimensions=HR_DIMENSIONS_EN) -> pl.LazyFrame:
+    """Scans the HR dataset through its Arrow IPC sidecar (see read_csv_cached).
+
+    The dimension columns are polars Categoricals. Queries memory-map the
+    sidecar and read only the columns and rows they need, so the dataset is
+    never held in memory as a DataFrame.
+    """
+    table = read_csv_cached(path, dimensions)
+    sidecar = f"{path}.arrow"
+    try:
+        current = pa.ipc.open_file(pa.memory_map(sidecar)).schema.metadata
+    except (OSError, pa.ArrowInvalid):
+        current = None
+    if current != table.schema.metadata:
+        # The sidecar couldn't be written: queries run on the parsed table
+        return pl.from_arrow(table).lazy()
+    return pl.scan_ipc(sidecar, memory_map=True)
+
+
+def scan_hr_data_pl(path: str) -> pl.LazyFrame:
+    """Scans a Hive-partitioned Parquet dataset (see tools/partition_hr_data.py).
+
+    Nothing is read until a query is collected, and the files of partitions
+    its filters exclude are never opened.
+    """
+    return pl.scan_parquet(
+        os.path.join(path, "**", "*.parquet"), hive_partitioning=True
+    )
@@ -0,0 +1,203 @@
+import operator
+import typing as t
+from abc import abstractmethod
+
+import numpy as np
+import pandas as pd
+import polars as pl
+# Taipy has no public API for custom table data yet: these accessors build on
+# its private _DataAccessor classes, as found in taipy-gui 4.0.3 to 4.1, the
+# versions pyproject.toml allows. Check them when raising that bound.
+from taipy.gui.data.data_accessor import _DataAccessor
+from taipy.gui.data.pandas_data_accessor import _PandasDataAccessor
+
+# Comparisons sent by the table column filters, besides "contains"
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class RowView:
+    """Rows of a shared table, selected by their positions.
+
+    Binding a RowView to a table sends the visible page only: the selected
+    rows are never copied into a DataFrame of their own.
+    """
+
+    def __init__(self, data: pd.DataFrame, rows: np.ndarray):
+        self.data = data
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, name, rows=None):
+        return self.data[name].iloc[self.rows if rows is None else rows]
+
+
+def page_bounds(payload, rowcount):
+    """Returns the first and last row of the requested page, as Taipy does."""
+    try:
+        start = int(payload.get("start", 0))
+    except (TypeError, ValueError):
+        start = 0
+    try:
+        end = int(payload.get("end", -1))
+    except (TypeError, ValueError):
+        end = -1
+    if start < 0 or start >= rowcount:
+        start = 0
+    if end < 0 or end >= rowcount:
+        end = rowcount - 1
+    if payload.get("reverse", False):
+        size = end - start
+        end = rowcount - 1 - start
+        if end < 0:
+            end = rowcount - 1
+        start = max(end - size, 0)
+    return start, end
+
+
+class _PagedDataAccessor(_DataAccessor):
+    """Serves tables one page at a time from a type pandas can't page itself.
+
+    Subclasses filter, sort and cut the page; the page is then formatted by
+    Taipy's own pandas accessor, so styles, formats and data formats behave
+    like they do for a DataFrame.
+    """
+
+    def __init__(self, gui):
+        super().__init__(gui)
+        self._pandas = _PandasDataAccessor(gui)
+
+    @abstractmethod
+    def get_page(self, value, filters, order_by, descending, payload):
+        """Returns the page DataFrame, its first row, and the filtered and total row counts."""
+        raise NotImplementedError
+
+    def get_data(self, var_name, value, payload, data_format):
+        # Aggregates group all the filtered rows, not those of a page
+        if payload.get("alldata", False) or payload.get("aggregates"):
+            return self._pandas.get_data(
+                var_name, self.to_pandas(value), payload, data_format
+            )
+        order_by = payload.get("orderby")
+        page, start, rowcount, fullrowcount = self.get_page(
+            value,
+            payload.get("filters") or [],
+            order_by if isinstance(order_by, str) and order_by else None,
+            payload.get("sort") == "desc",
+            payload,
+        )
+        ret = self._pandas.get_data(
+            var_name,
+            page,
+            {
+                **payload,
+                "start": 0,
+                "end": len(page) - 1,
+                "reverse": False,
+                "orderby": None,
+                "filters": None,
+            },
+            data_format,
+        )
+        ret["value"].update(start=start, rowcount=rowcount)
+        if fullrowcount != rowcount:
+            ret["value"]["fullrowcount"] = fullrowcount
+        return ret
+
+    def on_edit(self, value, payload):
+        raise ValueError(f"Cannot edit {type(value)}.")
+
+    def on_delete(self, value, payload):
+        raise ValueError(f"Cannot edit {type(value)}.")
+
+    def on_add(self, value, payload, new_row=None):
+        raise ValueError(f"Cannot edit {type(value)}.")
+
+    def to_csv(self, var_name, value):
+        return self._pandas.to_csv(var_name, self.to_pandas(value))
+
+
+class RowViewAccessor(_PagedDataAccessor):
+    @staticmethod
+    def get_supported_classes() -> t.List[t.Type]:
+        return [RowView]
+
+    def get_page(self, value: RowView, filters, order_by, descending, payload):
+        rows = value.rows
+        for fd in filters:
+            values = value.column(fd.get("col"), rows)
+            if fd.get("action") == "contains":
+                mask = values.astype(str).str.contains(
+                    str(fd.get("value")), regex=False
+                )
+            else:
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    values = values.astype(str)
+                mask = OPERATORS[fd.get("action")](values, fd.get("value"))
+            rows = rows[mask.to_numpy()]
+        start, end = page_bounds(payload, len(rows))
+        if order_by is not None:
+            keys = value.column(order_by, rows)
+            if isinstance(keys.dtype, pd.CategoricalDtype):
+                # The categories are sorted, so their codes sort like the values
+                keys = keys.cat.codes
+            order = np.argsort(keys.to_numpy(), kind="stable")
+            rows = rows[order[::-1] if descending else order]
+        return value.data.take(rows[start : end + 1]), start, len(rows), len(value)
+
+    def get_col_types(self, var_name, value: RowView):
+        return self._pandas.get_col_types(var_name, value.data.head(0))
+
+    def to_pandas(self, value: RowView):
+        return value.data.take(value.rows)
+
+
+class LazyFrameAccessor(_PagedDataAccessor):
+    """Runs the page query on a polars LazyFrame and converts only its result."""
+
+    @staticmethod
+    def get_supported_classes() -> t.List[t.Type]:
+        return [pl.LazyFrame]
+
+    def get_page(self, value: pl.LazyFrame, filters, order_by, descending, payload):
+        schema = value.collect_schema()
+        query = value
+        for fd in filters:
+            column = pl.col(fd.get("col"))
+            if isinstance(schema[fd.get("col")], (pl.Enum, pl.Categorical)):
+                column = column.cast(pl.String)
+            if fd.get("action") == "contains":
+                predicate = column.cast(pl.String).str.contains(
+                    str(fd.get("value")), literal=True
+                )
+            else:
+                predicate = OPERATORS[fd.get("action")](column, fd.get("value"))
+            query = query.filter(predicate)
+        rowcount = query.select(pl.len()).collect().item()
+        fullrowcount = value.select(pl.len()).collect().item() if filters else rowcount
+        start, end = page_bounds(payload, rowcount)
+        if order_by is not None:
+            query = query.sort(order_by, descending=descending, maintain_order=True)
+        page = query.slice(start, end + 1 - start).collect().to_pandas()
+        page.index = pd.RangeIndex(start, start + len(page))
+        return page, start, rowcount, fullrowcount
+
+    def get_col_types(self, var_name, value: pl.LazyFrame):
+        return self._pandas.get_col_types(var_name, value.head(0).collect().to_pandas())
+
+    def to_pandas(self, value: pl.LazyFrame):
+        return value.collect().to_pandas()
+
+
+def register_accessors(gui):
+    """Lets the tables of `gui` page RowViews and polars LazyFrames on the server."""
+    for accessor in (RowViewAccessor, LazyFrameAccessor):
+        gui._get_accessor()._register(accessor)
@@ -0,0 +1,170 @@
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Spans are appended to this JSONL file, one record per stage run
+TRACE_FILE = os.environ.get("EXPLORER_TRACE_FILE")
+# Totals per stage are served as Prometheus text on http://<host>:<port>/metrics
+METRICS_PORT = int(os.environ.get("EXPLORER_METRICS_PORT", "0"))
+ENABLED = bool(TRACE_FILE or METRICS_PORT)
+
+# Upper bounds (in seconds) of the stage duration histogram buckets
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+COUNTERS = ["rows_scanned", "rows_returned", "bytes"]
+# Explorer variables sent to the browser when they change. The others (row
+# positions, level totals, lazy queries) stay on the server, and the table
+# sends its visible page on its own requests.
+BOUND_OUTPUTS = {
+    "chart_data",
+    "map_fig_regions",
+    "map_fig_departments",
+    "map_fig_communes",
+    "sectors",
+    "jobs",
+    "years",
+    "regions",
+    "departments",
+}
+
+_parent = contextvars.ContextVar("parent", default=None)
+_lock = threading.Lock()
+_trace_file = (
+    open(TRACE_FILE, "a", buffering=1, encoding="utf-8") if TRACE_FILE else None
+)
+_stages = {}
+if _trace_file is not None:
+    atexit.register(_trace_file.close)
+
+
+@contextlib.contextmanager
+def span(stage):
+    """Times a stage of an explorer callback.
+
+    The body adds its counts (see COUNTERS) to the record it receives. Nested
+    spans record the stage they ran in as their parent.
+    """
+    record = {"stage": stage}
+    if not ENABLED:
+        yield record
+        return
+    record["parent"] = _parent.get()
+    token = _parent.set(stage)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _parent.reset(token)
+        export(record)
+
+
+def traced(stage):
+    """Runs each call of the decorated function in a span."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def payload_size(value):
+    """Bytes of JSON a value bound to the page would take.
+
+    Only the variables of BOUND_OUTPUTS are bound: callers size those alone.
+    """
+    if hasattr(value, "to_plotly_json"):
+        return len(value.to_json())
+    if hasattr(value, "to_json") and hasattr(value, "columns"):
+        return len(value.to_json(orient="records"))
+    if isinstance(value, list):
+        return len(json.dumps(value, default=str))
+    return 0
+
+
+def update_bytes(changes):
+    """Bytes sent to the client for a dict of updated variables, when tracing."""
+    if not ENABLED:
+        return 0
+    return sum(
+        payload_size(value) for name, value in changes.items() if name in BOUND_OUTPUTS
+    )
+
+
+def export(record):
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.write(json.dumps({"time": time.time(), **record}) + "\n")
+        stage = _stages.setdefault(
+            record["stage"],
+            {"count": 0, "seconds": 0.0, "buckets": [0] * len(BUCKETS)}
+            | dict.fromkeys(COUNTERS, 0),
+        )
+        stage["count"] += 1
+        stage["seconds"] += record["seconds"]
+        for i, bound in enumerate(BUCKETS):
+            if record["seconds"] <= bound:
+                stage["buckets"][i] += 1
+        for counter in COUNTERS:
+            stage[counter] += record.get(counter, 0)
+
+
+def metrics():
+    """Returns the totals per stage in the Prometheus text format."""
+    lines = [
+        "# HELP explorer_stage_seconds Wall time of the explorer callback stages.",
+        "# TYPE explorer_stage_seconds histogram",
+    ]
+    with _lock:
+        stages = {
+            name: {**stage, "buckets": list(stage["buckets"])}
+            for name, stage in _stages.items()
+        }
+    for name, stage in sorted(stages.items()):
+        for bound, count in zip(BUCKETS, stage["buckets"]):
+            lines.append(
+                f'explorer_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}'
+            )
+        lines.append(
+            f'explorer_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}'
+        )
+        lines.append(f'explorer_stage_seconds_sum{{stage="{name}"}} {stage["seconds"]}')
+        lines.append(f'explorer_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+    for counter in COUNTERS:
+        lines.append(f"# TYPE explorer_stage_{counter}_total counter")
+        for name, stage in sorted(stages.items()):
+            lines.append(
+                f'explorer_stage_{counter}_total{{stage="{name}"}} {stage[counter]}'
+            )
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if METRICS_PORT:
+    _server = ThreadingHTTPServer(("127.0.0.1", METRICS_PORT), MetricsHandler)
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
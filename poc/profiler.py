@@ -0,0 +1,109 @@
+import atexit
+import collections
+import functools
+import os
+import re
+import sys
+import threading
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.cache
+def is_app_code(code):
+    """Functions of this application, not of its libraries nor module bodies."""
+    filename = code.co_filename
+    return (
+        filename.startswith(APP_DIR + os.sep)
+        and "site-packages" not in filename
+        and filename != __file__
+        and code.co_name != "<module>"
+    )
+
+
+@functools.cache
+def is_callback(code):
+    # Nested functions, such as decorator wrappers, only run inside a callback
+    return is_app_code(code) and "<locals>" not in code.co_qualname
+
+
+def label(code):
+    module = os.path.splitext(os.path.relpath(code.co_filename, APP_DIR))[0]
+    name = code.co_qualname.replace("<lambda>", f"lambda_{code.co_firstlineno}")
+    return f"{module.replace(os.sep, '.')}.{name}"
+
+
+class SamplingProfiler:
+    """Samples the stacks of the threads running application code.
+
+    Every `interval` seconds, the stack of each thread is walked down to its
+    outermost application function, the callback it runs (a Taipy callback,
+    a lambda of a page or a worker task). The samples are counted per callback
+    and written every `flush_interval` seconds as collapsed stacks to
+    `<output_dir>/<callback>.folded`, the input format of flamegraph.pl,
+    speedscope and inferno. Idle threads cost a stack walk and no writes.
+    """
+
+    def __init__(self, output_dir="profiles", interval=0.01, flush_interval=10):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.stacks = collections.defaultdict(collections.Counter)
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_flush:
+                self.write()
+                next_flush = time.monotonic() + self.flush_interval
+
+    def sample(self):
+        own_thread = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            codes = []
+            root = None
+            while frame is not None:
+                codes.append(frame.f_code)
+                if is_callback(frame.f_code):
+                    root = len(codes)
+                frame = frame.f_back
+            if root is None:
+                continue
+            stack = [self._label(code) for code in reversed(codes[:root])]
+            self.stacks[stack[0]][";".join(stack)] += 1
+
+    def _label(self, code):
+        if code not in self._labels:
+            if is_app_code(code):
+                self._labels[code] = label(code)
+            else:
+                filename = os.path.basename(code.co_filename)
+                self._labels[code] = f"{code.co_name} ({filename})"
+        return self._labels[code]
+
+    def write(self):
+        for callback, stacks in list(self.stacks.items()):
+            filename = re.sub(r"[^\w.-]", "_", callback)
+            path = os.path.join(self.output_dir, f"{filename}.folded")
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                for stack, count in list(stacks.items()):
+                    file.write(f"{stack} {count}\n")
+            os.replace(f"{path}.tmp", path)
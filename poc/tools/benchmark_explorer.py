@@ -0,0 +1,320 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+POC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, POC_DIR)
+
+from pages.explorer.trace import BOUND_OUTPUTS, payload_size
+
+BACKENDS = {
+    "pandas": "pages.explorer.explorer_pd",
+    "polars": "pages.explorer.explorer",
+}
+
+# Each backend reads its own column names from data/hr_data.csv
+COLUMNS = {
+    "pandas": [
+        "Région",
+        "Département",
+        "Ville",
+        "Secteur",
+        "Métier",
+        "Recrutement",
+        "Année",
+    ],
+    "polars": [
+        "Region",
+        "Department",
+        "City",
+        "Sector",
+        "Job Title",
+        "Employees Needed",
+        "Year",
+    ],
+}
+
+# Selector variables changed by the "filter" steps, with the variable holding
+# their list of values
+SELECTORS = {
+    "selected_sector": "sectors",
+    "selected_job": "jobs",
+    "selected_year": "years",
+    "region_selected": "regions",
+    "department_selected": "departments",
+}
+OPERATIONS = ["load", "filter", "level", "drill", "map"]
+PERCENTILES = [50, 90, 99]
+
+
+# =====================
+# Worker
+# =====================
+class BenchState:
+    """Stands for a Taipy State: variables start from the module globals, and
+    the values assigned to page-bound variables (BOUND_OUTPUTS) during a step
+    are sized as if sent to the browser."""
+
+    def __init__(self, module):
+        for name in dir(module):
+            value = getattr(module, name)
+            if not name.startswith("_") and not callable(value):
+                self.__dict__[name] = value
+        self.__dict__["payload"] = 0
+
+    def __setattr__(self, name, value):
+        self.__dict__[name] = value
+        if name in BOUND_OUTPUTS:
+            self.__dict__["payload"] += payload_size(value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+def pick(values, rng):
+    # Selectors go back to their roll-up value ("Tout" or "All") a third of the time
+    return values[0] if rng.random() < 0.3 else rng.choice(values[1:] or values)
+
+
+def uncached_map(module):
+    # The pandas explorer caches the maps of each snapshot of its data
+    if hasattr(module, "hr_snapshot"):
+        return module.hr_snapshot.build_map
+    return module.cached_hr_map.__wrapped__
+
+
+def run_worker(backend, steps, seed):
+    """Loads a backend from the current directory and times its callbacks."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module = __import__(BACKENDS[backend], fromlist=["*"])
+    timings = {"load": [time.perf_counter() - start]}
+    payloads = {"load": [0]}
+    # Errors are reported by the steps' payloads, not through the GUI
+    module.notify = lambda *args, **kwargs: None
+
+    rng = random.Random(seed)
+    state = BenchState(module)
+
+    def measure(operation, callback, *args):
+        state.__dict__["payload"] = 0
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = callback(*args)
+        timings.setdefault(operation, []).append(time.perf_counter() - start)
+        payloads.setdefault(operation, []).append(state.payload + payload_size(result))
+
+    for _ in range(steps):
+        operation = rng.choice(OPERATIONS[1:])
+        if operation == "filter":
+            name = rng.choice(list(SELECTORS))
+            setattr(state, name, pick(getattr(state, SELECTORS[name]), rng))
+            measure(operation, module.apply_filters, state)
+        elif operation == "level":
+            state.selected_level = rng.choice(module.levels)
+            measure(operation, module.apply_filters, state)
+        elif operation == "drill":
+            # Clicks a region of the unfiltered map, as a user starting over would
+            for name, values in SELECTORS.items():
+                setattr(state, name, getattr(module, values)[0])
+            state.selected_level = module.levels[0]
+            state.center = module.center
+            state.zoom = module.zoom
+            module.apply_filters(state)
+            if state.map_fig_regions is None:
+                continue
+            # Figure charts send the indices of the selected points per trace
+            selected = [[rng.randrange(len(state.map_fig_regions.data[0].locations))]]
+            measure(operation, module.on_change, state, "selected_regions", selected)
+        else:
+            # Bypasses the shared figure cache to time the figure itself
+            measure(
+                operation,
+                uncached_map(module),
+                module.current_filters(state),
+                state.selected_level,
+                module.center_key(state.center),
+                state.zoom,
+            )
+
+    return {
+        "backend": backend,
+        "rows": getattr(module, "hr_rows", None) or len(module.hr_snapshot.data),
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "timings": timings,
+        "payloads": payloads,
+    }
+
+
+# =====================
+# Runner
+# =====================
+def prepare_workdir(workdir, data_file, backend):
+    """Lays out data/hr_data.csv with the backend's columns, and the GeoJSONs."""
+    os.makedirs(os.path.join(workdir, "data"))
+    os.symlink(os.path.join(POC_DIR, "geojson"), os.path.join(workdir, "geojson"))
+    target = os.path.join(workdir, "data", "hr_data.csv")
+    with open(data_file, encoding="utf-8") as source:
+        header = source.readline().strip().split(",")
+        if header == COLUMNS[backend]:
+            os.symlink(os.path.abspath(data_file), target)
+            return
+        for columns in COLUMNS.values():
+            if header == columns:
+                break
+        else:
+            raise ValueError(f"Unknown columns in {data_file}: {header}")
+        # Same data with the column names of the other backend
+        renamed = [COLUMNS[backend][columns.index(column)] for column in header]
+        with open(target, "w", encoding="utf-8") as file:
+            file.write(",".join(renamed) + "\n")
+            shutil.copyfileobj(source, file)
+
+
+def run_backend(data_file, backend, steps, seed):
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_workdir(workdir, data_file, backend)
+        env = {
+            **os.environ,
+            "PYTHONPATH": POC_DIR,
+            "EXPLORER_WORKERS": "0",
+            "EXPLORER_DEBOUNCE": "0",
+        }
+        env.pop("EXPLORER_WARM_UP", None)
+        worker = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, str(steps), str(seed)],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if worker.returncode != 0:
+        raise RuntimeError(f"{backend} on {data_file} failed:\n{worker.stderr}")
+    return json.loads(worker.stdout.splitlines()[-1])
+
+
+def generate_dataset(directory, scale, seed):
+    """Writes a dataset with `scale` cities per department using data/data.py."""
+    data_file = os.path.join(directory, f"hr_data.x{scale}.csv")
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(POC_DIR, "data", "data.py"),
+            "--output",
+            data_file,
+            "--scale",
+            str(scale),
+            "--seed",
+            str(seed),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return data_file
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def summarize(data_file, result):
+    """Yields one line per operation, with latencies in ms and payloads in KB."""
+    for operation in OPERATIONS:
+        timings = result["timings"].get(operation)
+        if not timings:
+            continue
+        payloads = result["payloads"][operation]
+        yield {
+            "data": os.path.basename(data_file),
+            "rows": result["rows"],
+            "backend": result["backend"],
+            "operation": operation,
+            "count": len(timings),
+            **{f"p{q}_ms": percentile(timings, q) * 1000 for q in PERCENTILES},
+            "max_ms": max(timings) * 1000,
+            "payload_p50_kb": percentile(payloads, 50) / 1024,
+            "payload_max_kb": max(payloads) / 1024,
+            "peak_rss_mb": result["peak_rss"] / 1024 / 1024,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Times the explorer callbacks of each backend on the same "
+        "sequence of user actions, for one or more datasets."
+    )
+    parser.add_argument("data_files", nargs="*", help="HR datasets (CSV)")
+    parser.add_argument(
+        "--scales",
+        help="also generate datasets with these comma-separated numbers of "
+        "cities per department (see data/data.py --scale)",
+    )
+    parser.add_argument(
+        "--backends",
+        default=",".join(BACKENDS),
+        help="comma-separated backends (default: %(default)s)",
+    )
+    parser.add_argument("--steps", type=int, default=200, help="actions per run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also append the results to this JSONL file")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend '{backend}' (use {', '.join(BACKENDS)})")
+    for data_file in args.data_files:
+        if not os.path.exists(data_file):
+            parser.error(f"couldn't read {data_file}")
+    if not args.data_files and not args.scales:
+        parser.error("give at least one dataset or --scales")
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_files = args.data_files + [
+            generate_dataset(directory, int(scale), args.seed)
+            for scale in (args.scales.split(",") if args.scales else [])
+        ]
+        run_matrix(data_files, backends, args.steps, args.seed, args.output)
+
+
+def run_matrix(data_files, backends, steps, seed, output=None):
+    print(
+        f"{'data':>16} {'rows':>9} {'backend':>7} {'operation':>9} {'n':>4} "
+        + " ".join(f"{f'p{q} ms':>8}" for q in PERCENTILES)
+        + f" {'max ms':>8} {'KB p50':>8} {'KB max':>8} {'peak MB':>8}"
+    )
+    for data_file in data_files:
+        for backend in backends:
+            result = run_backend(data_file, backend, steps, seed)
+            for line in summarize(data_file, result):
+                print(
+                    f"{line['data']:>16} {line['rows']:>9} {line['backend']:>7} "
+                    f"{line['operation']:>9} {line['count']:>4} "
+                    + " ".join(f"{line[f'p{q}_ms']:>8.1f}" for q in PERCENTILES)
+                    + f" {line['max_ms']:>8.1f} {line['payload_p50_kb']:>8.1f}"
+                    f" {line['payload_max_kb']:>8.1f} {line['peak_rss_mb']:>8.0f}"
+                )
+                if output:
+                    with open(output, "a", encoding="utf-8") as file:
+                        file.write(json.dumps(line) + "\n")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        backend, steps, seed = sys.argv[2], int(sys.argv[3]), int(sys.argv[4])
+        print(json.dumps(run_worker(backend, steps, seed)))
+    else:
+        main()
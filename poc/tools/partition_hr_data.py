@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# Partition columns, in directory order, for each naming of the HR columns
+PARTITIONS = [["Année", "Région"], ["Year", "Region"]]
+# Names the polars explorer (pages/explorer/explorer.py) reads
+ENGLISH_COLUMNS = {
+    "Région": "Region",
+    "Département": "Department",
+    "Ville": "City",
+    "Secteur": "Sector",
+    "Métier": "Job Title",
+    "Recrutement": "Employees Needed",
+    "Année": "Year",
+}
+
+# Read command line arguments and check for potential errors
+english = "--english" in sys.argv[1:]
+args = [arg for arg in sys.argv[1:] if arg != "--english"]
+if len(args) != 2:
+    print(f"Usage: {sys.argv[0]} <input_csv_or_parquet_file> <output_dir> [--english]")
+    print("Writes the HR dataset as Parquet files partitioned by year and region")
+    print("(<output_dir>/Année=2030/Région=Bretagne/part-0.parquet), streaming the")
+    print("input so it doesn't need to fit in memory. --english renames the columns")
+    print("to the ones the polars explorer reads (HR_DATASET=<output_dir>).")
+    exit(1)
+input_file, output_dir = args
+if not os.path.exists(input_file):
+    print(f"ERROR: Couldn't read input file: {input_file}")
+    exit(1)
+if os.path.exists(output_dir):
+    print(f"ERROR: Output directory {output_dir} already exists")
+    exit(1)
+
+source = ds.dataset(
+    input_file, format="parquet" if input_file.endswith(".parquet") else "csv"
+)
+columns = {name: ds.field(name) for name in source.schema.names}
+if english:
+    columns = {
+        ENGLISH_COLUMNS.get(name, name): field for name, field in columns.items()
+    }
+partitions = next(
+    (partition for partition in PARTITIONS if set(partition) <= set(columns)), None
+)
+if partitions is None:
+    print(f"ERROR: No year and region columns in {input_file}: {source.schema.names}")
+    exit(1)
+
+scanner = source.scanner(columns=columns)
+ds.write_dataset(
+    scanner,
+    output_dir,
+    format="parquet",
+    partitioning=ds.partitioning(
+        pa.schema([scanner.projected_schema.field(name) for name in partitions]),
+        flavor="hive",
+    ),
+    basename_template="part-{i}.parquet",
+)
+files = [name for _, _, names in os.walk(output_dir) for name in names]
+print(f"{len(files)} partitions written to {output_dir}")
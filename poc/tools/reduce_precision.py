@@ -2,58 +2,141 @@ import json
 import os
 import sys
 
+import numpy as np
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Files holding one GeoJSON feature per line (RFC 8142 or newline-delimited)
+LINE_DELIMITED_EXTENSIONS = (".geojsonl", ".geojsons", ".geojsonseq", ".ndjson")
+
 # Read command line arguments and check for potential errors
-if len(sys.argv) != 4:
+stream = "--stream" in sys.argv[1:]
+args = [arg for arg in sys.argv[1:] if arg != "--stream"]
+if len(args) != 3:
     print(
-        f"Usage: {sys.argv[0]} <input_geojson_file> <output_geojson_file> <precision>"
+        f"Usage: {sys.argv[0]} <input_geojson_file> <output_geojson_file> <precision> [--stream]"
     )
+    print("--stream processes one feature at a time, with a memory use that")
+    print("doesn't depend on the input size.")
     exit(1)
-if not os.path.exists(sys.argv[1]):
-    print(f"ERROR: Couldn't read input GeoJson file: {sys.argv[1]}")
+input_file, output_file, precision = args
+if not os.path.exists(input_file):
+    print(f"ERROR: Couldn't read input GeoJson file: {input_file}")
     exit(1)
-if os.path.exists(sys.argv[2]):
-    print(f"ERROR: Output file {sys.argv[2]} already exists")
+if os.path.exists(output_file):
+    print(f"ERROR: Output file {output_file} already exists")
     exit(1)
-precision = 0
-if not sys.argv[3].isdigit():
-    print(f"ERROR: Precision must be an integer value (found '{sys.argv[3]}')")
+if not precision.isdigit():
+    print(f"ERROR: Precision must be an integer value (found '{precision}')")
     exit(1)
-precision = int(sys.argv[3])
+precision = int(precision)
 if precision < 1 or precision > 15:
     print(f"ERROR: Precision must be positive and less than 15 (found '{precision}')")
     exit(1)
-
-# Load the GeoJSON file
-input_file_size = os.stat(sys.argv[1]).st_size // 1024 // 1024
-print(f"Input file size: {input_file_size} Mb")
-with open(sys.argv[1], "r") as file:
-    data = json.load(file)
+line_delimited_input = input_file.endswith(LINE_DELIMITED_EXTENSIONS)
+line_delimited_output = output_file.endswith(LINE_DELIMITED_EXTENSIONS)
+if stream and not line_delimited_input and ijson is None:
+    print("ERROR: Streaming a FeatureCollection requires the 'ijson' package")
+    print(f"       (or a line-delimited input: {', '.join(LINE_DELIMITED_EXTENSIONS)})")
+    exit(1)
 
 
 # Round all coordinate values and remove duplicates
 def reduce_list(coords):
-    """Recursively rounds coordinates to the specified precision."""
-    if isinstance(coords[0], list):
+    """Recursively rounds the positions of each ring to the specified precision.
+
+    Consecutive positions that become identical are merged. A ring left with
+    fewer than 4 positions, or no longer closed, isn't valid GeoJSON (Plotly
+    drops its polygon): the original ring is kept instead.
+    """
+    if not coords:
+        return coords
+    if isinstance(coords[0][0], list):
         return [reduce_list(coord) for coord in coords]
-    last_coord = None
-    new_coord_list = []
-    for coord in coords:
-        new_coord = round(coord, precision)
-        if new_coord.is_integer():
-            new_coord = int(new_coord)
-        if new_coord != last_coord:
-            last_coord = new_coord
-            new_coord_list.append(new_coord)
-    return new_coord_list
-
-
-for feature in data["features"]:
+    positions = np.round(np.asarray(coords, dtype=float), precision)
+    keep = np.ones(len(positions), dtype=bool)
+    keep[1:] = (positions[1:] != positions[:-1]).any(axis=1)
+    positions = positions[keep]
+    if len(positions) < 4 or (positions[0] != positions[-1]).any():
+        return coords
+    return positions.tolist()
+
+
+def reduce_feature(feature):
     geometry = feature["geometry"]
-    if geometry["type"] in ["Polygon", "MultiPolygon"]:
+    if geometry and geometry["type"] in ["Polygon", "MultiPolygon"]:
         geometry["coordinates"] = reduce_list(geometry["coordinates"])
+    return feature
+
+
+def read_members(file):
+    """Returns the top-level members of a FeatureCollection besides its features.
+
+    The features are skipped without being built, so this pass takes as
+    little memory as reading them one at a time.
+    """
+    members = {}
+    key = builder = None
+    for prefix, event, value in ijson.parse(file, use_float=True):
+        if prefix == "" and event == "map_key":
+            key = value
+            builder = None if key == "features" else ijson.ObjectBuilder()
+        elif builder is not None:
+            builder.event(event, value)
+            # A member ends with a scalar, or the end of its map or array
+            if prefix == key and event not in ("start_map", "start_array", "map_key"):
+                members[key] = builder.value
+                builder = None
+    return members
+
+
+def read_features(file):
+    """Yields the features of the input file one at a time."""
+    if line_delimited_input:
+        for line in file:
+            line = line.strip().lstrip(b"\x1e")
+            if line:
+                yield json.loads(line)
+    else:
+        yield from ijson.items(file, "features.item", use_float=True)
+
+
+input_file_size = os.stat(input_file).st_size // 1024 // 1024
+print(f"Input file size: {input_file_size} Mb")
+if stream:
+    count = 0
+    members = {"type": "FeatureCollection"}
+    if not line_delimited_input and not line_delimited_output:
+        # Other members, such as crs or name, are kept like json.dump keeps them
+        with open(input_file, "rb") as source:
+            members.update(read_members(source))
+    with open(input_file, "rb") as source, open(output_file, "w") as file:
+        if not line_delimited_output:
+            file.write(json.dumps(members)[:-1] + ', "features": [')
+        for feature in read_features(source):
+            if line_delimited_output:
+                file.write(f"{json.dumps(reduce_feature(feature))}\n")
+            else:
+                file.write(
+                    f"{',' if count else ''}\n{json.dumps(reduce_feature(feature))}"
+                )
+            count += 1
+        if not line_delimited_output:
+            file.write("\n]}\n")
+    print(f"{count} features processed")
+else:
+    # Load the GeoJSON file
+    with open(input_file, "r") as file:
+        data = json.load(file)
+
+    for feature in data["features"]:
+        reduce_feature(feature)
 
-# Save the modified GeoJSON
-with open(sys.argv[2], "w") as file:
-    json.dump(data, file)
-output_file_size = os.stat(sys.argv[2]).st_size // 1024 // 1024
+    # Save the modified GeoJSON
+    with open(output_file, "w") as file:
+        json.dump(data, file)
+output_file_size = os.stat(output_file).st_size // 1024 // 1024
 print(f"Output file size: {output_file_size} Mb")
@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+
+import shapely
+from shapely.geometry import mapping, shape
+
+# Read command line arguments and check for potential errors
+if len(sys.argv) < 3:
+    print(f"Usage: {sys.argv[0]} <input_geojson_file> <max_zoom>:<tolerance> ...")
+    print("Generates one simplified version of the GeoJSON data per zoom tier,")
+    print("named <input>.z<max_zoom>.geojson, where <tolerance> is in degrees.")
+    print("The explorer uses a tier for every map zoom up to <max_zoom>.")
+    exit(1)
+if not os.path.exists(sys.argv[1]):
+    print(f"ERROR: Couldn't read input GeoJson file: {sys.argv[1]}")
+    exit(1)
+if not hasattr(shapely, "coverage_simplify"):
+    print("ERROR: This tool requires shapely 2.1 or later, built with GEOS 3.12+")
+    exit(1)
+tiers = []
+for tier in sys.argv[2:]:
+    max_zoom, _, tolerance = tier.partition(":")
+    try:
+        tiers.append((int(max_zoom), float(tolerance)))
+    except ValueError:
+        print(f"ERROR: Tiers must look like <max_zoom>:<tolerance> (found '{tier}')")
+        exit(1)
+parts = os.path.splitext(sys.argv[1])
+
+with open(sys.argv[1], encoding="utf-8") as file:
+    geojson = json.load(file)
+geometries = [shape(feature["geometry"]) for feature in geojson["features"]]
+vertices = shapely.get_num_coordinates(geometries).sum()
+
+for max_zoom, tolerance in tiers:
+    output_file = f"{parts[0]}.z{max_zoom}{parts[1]}"
+    # Simplifying the layer as a coverage moves the edges shared by two
+    # neighbours together, so no slivers or overlaps appear between them
+    simplified = shapely.coverage_simplify(geometries, tolerance)
+    features = [
+        {**feature, "geometry": mapping(geometry)}
+        for feature, geometry in zip(geojson["features"], simplified)
+    ]
+    print(
+        f"Generating {output_file}: "
+        f"{shapely.get_num_coordinates(simplified).sum()}/{vertices} vertices"
+    )
+    with open(output_file, "w", encoding="utf-8") as file:
+        json.dump({**geojson, "features": features}, file, ensure_ascii=False)